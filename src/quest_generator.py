@@ -1,23 +1,58 @@
-import json
+import os
 import re
+import sys
+
+# dataclass(slots=True) gibt es erst ab 3.10 - lieber klar abbrechen als mit TypeError
+if sys.version_info < (3, 10):
+    raise SystemExit(f"Quest-Planer braucht Python 3.10 oder neuer (gefunden: {sys.version.split()[0]}).")
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
+# filedialog/messagebox werden erst in den Methoden importiert, die sie brauchen:
+# wer nur project_to_jsonable/render_html nutzt, lädt sie nicht
+from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, field, fields
+from collections import Counter
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Set, Tuple
+
+# JSON-Codec: orjson > ujson > stdlib-json (die ersten beiden sind optional).
+# Alle drei schreiben eingerücktes UTF-8 und lesen bytes.
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+
+        def _dumps(obj) -> bytes:
+            return ujson.dumps(obj, indent=2, ensure_ascii=False,
+                               escape_forward_slashes=False).encode("utf-8")
+
+        _loads = ujson.loads
+    except ImportError:
+        import json
+
+        def _dumps(obj) -> bytes:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+        _loads = json.loads
 
 
 # ----------------------------
 # Datenmodell
 # ----------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Option:
     label: str = ""
     target: str = ""  # node_id
 
-@dataclass
+@dataclass(slots=True)
 class Node:
     node_id: str = "start"      # HTML anchor id
     title: str = "Start"
@@ -30,7 +65,7 @@ class Node:
     notes: str = ""
     options: List[Option] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class QuestMeta:
     quest_name: str = "Neue Quest"
     region: str = "Unbekannt"
@@ -43,25 +78,42 @@ class QuestMeta:
     important_flags: str = ""
     version_stamp: str = ""
 
-@dataclass
+@dataclass(slots=True)
 class QuestProject:
     meta: QuestMeta = field(default_factory=QuestMeta)
     nodes: List[Node] = field(default_factory=list)
 
+_META_FIELDS = tuple(f.name for f in fields(QuestMeta))
+
 
 # ----------------------------
 # Hilfsfunktionen
 # ----------------------------
 
+_UMLAUT_MAP = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss",
+               "Ä": "ae", "Ö": "oe", "Ü": "ue", "ẞ": "ss"}
+_UMLAUT_TRANS = str.maketrans(_UMLAUT_MAP)
+# Jede Folge von Nicht-ID-Zeichen (inkl. vorhandener "-") wird zu genau einem "-",
+# damit reicht ein einziger Regex-Durchlauf statt Ersetzen + Zusammenfassen.
+_RE_NON_ID = re.compile(r"[^a-z0-9_]+")
+_ID_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789_-"
+# ASCII-Schnellweg: bytes.translate mit 256er-Tabelle macht jedes Nicht-ID-Byte zu "-"
+_ASCII_TO_DASH = bytes(c if chr(c) in _ID_CHARS else ord("-") for c in range(256))
+
 def sanitize_id(raw: str) -> str:
     """
     Macht aus beliebigem Text eine HTML-taugliche id: a-z0-9_-
     """
-    raw = raw.strip().lower()
-    raw = raw.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
-    raw = re.sub(r"[^a-z0-9\-_]+", "-", raw)
-    raw = re.sub(r"-{2,}", "-", raw).strip("-")
-    return raw or "node"
+    raw = raw.strip().lower().translate(_UMLAUT_TRANS)
+    # strip(_ID_CHARS) bleibt nur leer, wenn alle Zeichen schon erlaubt sind
+    if raw.strip(_ID_CHARS):
+        if not raw.isascii():
+            return _RE_NON_ID.sub("-", raw).strip("-") or "node"
+        raw = raw.encode("ascii").translate(_ASCII_TO_DASH).decode("ascii")
+    if "--" in raw:
+        # split + leere Teile verwerfen = "-"-Läufe zusammenfassen und Ränder strippen
+        raw = "-".join(filter(None, raw.split("-")))
+    return raw.strip("-") or "node"
 
 def lines_to_list(text: str) -> List[str]:
     return [ln.strip() for ln in text.splitlines() if ln.strip()]
@@ -72,10 +124,11 @@ def list_to_lines(items: List[str]) -> str:
 def now_stamp() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M")
 
+# '"' mit escapen, weil html_escape auch in id=/href= Attributen landet
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})
+
 def html_escape(s: str) -> str:
-    return (s.replace("&", "&amp;")
-             .replace("<", "&lt;")
-             .replace(">", "&gt;"))
+    return s.translate(_HTML_ESCAPE)
 
 def option_to_dict(opt: Option) -> Dict:
     return {"label": opt.label, "target": opt.target}
@@ -83,39 +136,48 @@ def option_to_dict(opt: Option) -> Dict:
 def option_from_dict(d: Dict) -> Option:
     return Option(label=d.get("label",""), target=d.get("target",""))
 
+def _node_to_jsonable(n: Node) -> Dict:
+    # Listen werden nur referenziert, nicht kopiert (asdict würde alles tief kopieren)
+    return {
+        "node_id": n.node_id,
+        "title": n.title,
+        "scene": n.scene,
+        "dialog": n.dialog,
+        "content": n.content,
+        "info_items": n.info_items,
+        "tech_flags": n.tech_flags,
+        "outcomes": n.outcomes,
+        "notes": n.notes,
+        "options": [option_to_dict(o) for o in n.options]
+    }
+
 def project_to_jsonable(p: QuestProject) -> Dict:
     return {
-        "meta": asdict(p.meta),
-        "nodes": [
-            {
-                **{k: v for k, v in asdict(n).items() if k != "options"},
-                "options": [option_to_dict(o) for o in n.options]
-            }
-            for n in p.nodes
-        ]
+        "meta": {k: getattr(p.meta, k) for k in _META_FIELDS},
+        "nodes": [_node_to_jsonable(n) for n in p.nodes]
     }
 
+def _node_from_jsonable(nd: Dict) -> Node:
+    get = nd.get
+    return Node(
+        node_id=get("node_id", "node"),
+        title=get("title", ""),
+        scene=get("scene", ""),
+        dialog=get("dialog", ""),
+        content=get("content", ""),
+        info_items=get("info_items") or [],
+        tech_flags=get("tech_flags") or [],
+        outcomes=get("outcomes") or [],
+        notes=get("notes", ""),
+        options=[option_from_dict(o) for o in (get("options") or [])]
+    )
+
 def project_from_jsonable(d: Dict) -> QuestProject:
     meta_d = d.get("meta", {})
     nodes_d = d.get("nodes", [])
-    meta = QuestMeta(**{k: meta_d.get(k, "") for k in QuestMeta().__dict__.keys()})
-
-    nodes: List[Node] = []
-    for nd in nodes_d:
-        n = Node(
-            node_id=nd.get("node_id","node"),
-            title=nd.get("title",""),
-            scene=nd.get("scene",""),
-            dialog=nd.get("dialog",""),
-            content=nd.get("content",""),
-            info_items=nd.get("info_items", []) or [],
-            tech_flags=nd.get("tech_flags", []) or [],
-            outcomes=nd.get("outcomes", []) or [],
-            notes=nd.get("notes",""),
-            options=[option_from_dict(o) for o in (nd.get("options", []) or [])]
-        )
-        nodes.append(n)
+    meta = QuestMeta(**{k: meta_d.get(k, "") for k in _META_FIELDS})
 
+    nodes: List[Node] = [_node_from_jsonable(nd) for nd in nodes_d]
     return QuestProject(meta=meta, nodes=nodes)
 
 
@@ -281,15 +343,21 @@ JS_BLOCK = r"""
   </script>
 """
 
-def render_nav(nodes: List[Node]) -> str:
-    parts = ['<nav aria-label="Quest-Navigation">', '<a href="#top">Übersicht</a>']
-    for n in nodes:
-        label = html_escape(n.title or n.node_id)
-        parts.append(f'<a href="#{html_escape(n.node_id)}">{label}</a>')
-    parts.append("</nav>")
-    return "\n      ".join(parts)
-
-def render_meta_list(meta: QuestMeta) -> str:
+# (ID/Titel-Paare, HTML) der zuletzt gerenderten Navigation. Die Nav hängt nur
+# an IDs und Titeln, reine Textänderungen an Knoten brauchen sie nicht neu.
+_nav_cache: Tuple[tuple, str] = ((), "")
+
+def render_nav(buf: List[str], escaped_ids: List[str], escaped_titles: List[str]) -> None:
+    global _nav_cache
+    key = tuple(zip(escaped_ids, escaped_titles))
+    if key != _nav_cache[0]:
+        parts = ['<nav aria-label="Quest-Navigation">\n      <a href="#top">Übersicht</a>']
+        parts.extend(f'\n      <a href="#{esc_id}">{esc_title}</a>' for esc_id, esc_title in key)
+        parts.append("\n      </nav>")
+        _nav_cache = (key, "".join(parts))
+    buf.append(_nav_cache[1])
+
+def render_meta_list(buf: List[str], meta: QuestMeta) -> None:
     items = [
         ("Questgeber", meta.quest_giver),
         ("Voraussetzung", meta.prerequisite),
@@ -298,123 +366,125 @@ def render_meta_list(meta: QuestMeta) -> str:
         ("Belohnungen", meta.rewards),
         ("Wichtige Flags", meta.important_flags),
     ]
-    lis = []
+    sep = ""
     for k, v in items:
         v = v.strip() or "—"
-        lis.append(f'<li><strong>{html_escape(k)}:</strong> {html_escape(v)}</li>')
-    return "\n        ".join(lis)
+        buf.append(f'{sep}<li><strong>{html_escape(k)}:</strong> {html_escape(v)}</li>')
+        sep = "\n        "
 
-def render_options(node: Node, node_ids: List[str]) -> str:
+# Fallbacks für leere Optionen - enthalten keine HTML-Sonderzeichen
+_FALLBACK_LABEL = "Option"
+_FALLBACK_TARGET = "top"
+
+def render_options(buf: List[str], node: Node, node_ids: Set[str]) -> None:
     if not node.options:
-        return "<p><em>Keine Optionen.</em></p>"
-    out = ["<h3>Optionen</h3>", "<ol>"]
+        buf.append("<p><em>Keine Optionen.</em></p>")
+        return
+    append = buf.append
+    esc = html_escape
+    append("<h3>Optionen</h3>\n      <ol>")
     for opt in node.options:
-        label = html_escape(opt.label.strip() or "Option")
+        label = esc(opt.label.strip()) or _FALLBACK_LABEL
         target = opt.target.strip()
-        if target not in node_ids:
-            # Ziel existiert nicht (noch). Link bleibt, aber wir markieren’s.
-            out.append(f'<li><a href="#{html_escape(target or "top")}">{label}</a> <em style="color:#b42318;">(Ziel unbekannt)</em></li>')
+        href = esc(target) or _FALLBACK_TARGET
+        if target in node_ids:
+            append(f'\n      <li><a href="#{href}">{label}</a></li>')
         else:
-            out.append(f'<li><a href="#{html_escape(target)}">{label}</a></li>')
-    out.append("</ol>")
-    return "\n      ".join(out)
-
-def render_list_block(title: str, items: List[str]) -> str:
-    if not items:
-        return ""
-    lis = "\n        ".join(f"<li>{html_escape(it)}</li>" for it in items)
-    return f"""
-      <p><strong>{html_escape(title)}:</strong></p>
-      <ul>
-        {lis}
-      </ul>
-""".rstrip()
-
-def render_details(title: str, items: List[str]) -> str:
-    if not items:
-        return ""
-    lis = "\n          ".join(f"<li>{html_escape(it)}</li>" for it in items)
-    return f"""
-      <details>
-        <summary>{html_escape(title)}</summary>
-        <ul>
-          {lis}
-        </ul>
-      </details>
-""".rstrip()
-
-def render_node_section(node: Node, node_ids: List[str]) -> str:
-    h2 = html_escape(node.title.strip() or node.node_id)
+            # Ziel existiert nicht (noch). Link bleibt, aber wir markieren’s.
+            append(f'\n      <li><a href="#{href}">{label}</a> <em style="color:#b42318;">(Ziel unbekannt)</em></li>')
+    buf.append("\n      </ol>")
+
+def _list_block_template(title: str, field_name: str) -> str:
+    return f"\n      <p><strong>{html_escape(title)}:</strong></p>\n      <ul>{{{field_name}}}</ul>"
+
+def _details_template(title: str, field_name: str) -> str:
+    return (f"\n      <details>\n        <summary>{html_escape(title)}</summary>\n"
+            f"        <ul>{{{field_name}}}</ul>\n      </details>")
+
+def _render_items(items: List[str]) -> str:
+    # <li> ohne Einrückung/Zeilenumbruch dazwischen - für die Darstellung egal
+    return "".join(f"<li>{it.translate(_HTML_ESCAPE)}</li>" for it in items)
+
+# Struktur eines Knotens (welche Blöcke sind befüllt) -> (Kopf, Fuß) als Format-Strings.
+# Die Verzweigungen laufen so nur einmal pro Struktur, nicht bei jedem Rendern;
+# die Optionen werden zwischen Kopf und Fuß gerendert.
+_SECTION_TEMPLATES: Dict[Tuple[bool, ...], Tuple[str, str]] = {}
+
+def _build_section_template(shape: Tuple[bool, ...]) -> Tuple[str, str]:
+    has_scene, has_content, has_dialog, has_info, has_tech, has_outcomes, has_notes = shape
+
+    head = ['<section id="{node_id}">\n      <h2>{title}</h2>']
+    if has_scene:
+        head.append("\n      <p><strong>Szene:</strong> {scene}</p>")
+    if has_content:
+        head.append("\n      <p><strong>Inhalt:</strong> {content}</p>")
+    if has_dialog:
+        head.append("\n      <p><strong>Dialog:</strong></p>\n      <blockquote>\n        <pre>\n    {dialog}"
+                    "\n        </pre>\n      </blockquote>")
+    # Listen-Blöcke bringen ihren eigenen Zeilenumbruch mit
+    if has_info:
+        head.append("\n    " + _list_block_template("Wichtige Information", "info_items"))
+    if has_tech:
+        head.append("\n    " + _details_template("Technik/Flags", "tech_flags"))
+    if has_outcomes:
+        head.append("\n    " + _details_template("Enden/Outcomes (Notizblock)", "outcomes"))
+    head.append("\n    ")
+
+    tail = []
+    if has_notes:
+        tail.append("\n      <p><strong>Notizen:</strong> {notes}</p>")
+    tail.append('\n      <p><a href="#top">↑ Zur Übersicht</a></p>\n    </section>')
+    return "".join(head), "".join(tail)
+
+def render_node_section(buf: List[str], node: Node, esc_id: str, esc_title: str,
+                        node_ids: Set[str]) -> None:
     scene = node.scene.strip()
     dialog = node.dialog.strip()
     content = node.content.strip()
     notes = node.notes.strip()
 
-    parts = [f'<section id="{html_escape(node.node_id)}">', f"  <h2>{h2}</h2>"]
-
-    if scene:
-        parts.append(f'  <p><strong>Szene:</strong> {html_escape(scene)}</p>')
-
-    if content:
-        parts.append(f'  <p><strong>Inhalt:</strong> {html_escape(content)}</p>')
-
-    if dialog:
-        parts.append("  <p><strong>Dialog:</strong></p>")
-        parts.append("  <blockquote>")
-        parts.append("    <pre>")
-        parts.append(html_escape(dialog))
-        parts.append("    </pre>")
-        parts.append("  </blockquote>")
-
-    info_block = render_list_block("Wichtige Information", node.info_items)
-    if info_block:
-        parts.append(info_block)
-
-    tech_details = render_details("Technik/Flags", node.tech_flags)
-    if tech_details:
-        parts.append(tech_details)
-
-    outcomes_details = render_details("Enden/Outcomes (Notizblock)", node.outcomes)
-    if outcomes_details:
-        parts.append(outcomes_details)
+    shape = (bool(scene), bool(content), bool(dialog), bool(node.info_items),
+             bool(node.tech_flags), bool(node.outcomes), bool(notes))
+    template = _SECTION_TEMPLATES.get(shape)
+    if template is None:
+        template = _SECTION_TEMPLATES[shape] = _build_section_template(shape)
+    head, tail = template
+
+    # leere Felder kommen im Template nicht vor, format() ignoriert sie
+    buf.append(head.format(
+        node_id=esc_id,
+        title=esc_title,
+        scene=html_escape(scene),
+        content=html_escape(content),
+        dialog=html_escape(dialog),
+        info_items=_render_items(node.info_items),
+        tech_flags=_render_items(node.tech_flags),
+        outcomes=_render_items(node.outcomes),
+    ))
 
     # Optionen
-    parts.append(render_options(node, node_ids))
+    render_options(buf, node, node_ids)
 
-    if notes:
-        parts.append(f'  <p><strong>Notizen:</strong> {html_escape(notes)}</p>')
+    buf.append(tail.format(notes=html_escape(notes)))
 
-    parts.append('  <p><a href="#top">↑ Zur Übersicht</a></p>')
-    parts.append("</section>")
-    return "\n    ".join(parts)
-
-def render_html(project: QuestProject, include_js: bool = True) -> str:
+def iter_html(project: QuestProject, include_js: bool = True) -> Iterator[str]:
+    """
+    Liefert das HTML stückweise (Kopf, je Knoten eine Section, Fuß), damit der
+    Export direkt in die Datei streamen kann, ohne die ganze Seite im Speicher.
+    """
     meta = project.meta
     nodes = project.nodes
-    node_ids = [n.node_id for n in nodes]
+    node_ids = {n.node_id for n in nodes}
+    # ID und Titel werden in Nav und Section gebraucht -> nur einmal escapen
+    escaped_ids = [html_escape(n.node_id) for n in nodes]
+    escaped_titles = [html_escape(n.title.strip() or n.node_id) for n in nodes]
 
     title = f"Quest-Präsentator: {meta.quest_name}".strip()
-    nav = render_nav(nodes)
-
     version = meta.version_stamp.strip() or now_stamp()
 
-    # Übersicht + Metadaten
-    top_section = f"""
-    <section id="top">
-      <h2>Übersicht</h2>
-      <p><strong>Kurzbeschreibung:</strong> {html_escape(meta.short_description.strip() or "—")}</p>
-      <p><strong>Quest Metadaten</strong></p>
-      <ul>
-        {render_meta_list(meta)}
-      </ul>
-      <hr>
-      <p><a href="#{html_escape(nodes[0].node_id if nodes else "top")}">→ Zum Start</a></p>
-    </section>
-""".rstrip()
-
-    node_sections = "\n\n    ".join(render_node_section(n, node_ids) for n in nodes)
-
-    html = f"""<!doctype html>
+    # Kopf bis einschließlich Übersicht in einem Puffer sammeln
+    buf: List[str] = []
+    buf.append(f"""<!doctype html>
 <html lang="de">
 <head>
   <meta charset="utf-8" />
@@ -427,14 +497,41 @@ def render_html(project: QuestProject, include_js: bool = True) -> str:
   <header>
     <h1>Quest: {html_escape(meta.quest_name.strip() or "—")}</h1>
     <p><strong>Region:</strong> {html_escape(meta.region.strip() or "—")}</p>
-    {nav}
+    """)
+    render_nav(buf, escaped_ids, escaped_titles)
+
+    # Übersicht + Metadaten
+    buf.append(f"""
     <hr>
   </header>
 
   <main>
-{top_section}
 
-    {node_sections}
+    <section id="top">
+      <h2>Übersicht</h2>
+      <p><strong>Kurzbeschreibung:</strong> {html_escape(meta.short_description.strip() or "—")}</p>
+      <p><strong>Quest Metadaten</strong></p>
+      <ul>
+        """)
+    render_meta_list(buf, meta)
+    buf.append(f"""
+      </ul>
+      <hr>
+      <p><a href="#{escaped_ids[0] if escaped_ids else "top"}">→ Zum Start</a></p>
+    </section>
+
+    """)
+    yield "".join(buf)
+
+    sep = ""
+    for n, esc_id, esc_title in zip(nodes, escaped_ids, escaped_titles):
+        # jede Section in einen frischen Puffer, nach dem yield ist sie frei
+        sbuf: List[str] = []
+        render_node_section(sbuf, n, esc_id, esc_title, node_ids)
+        yield sep + "".join(sbuf)
+        sep = "\n\n    "
+
+    yield f"""
 
     <section id="end">
       <h2>Ende / Notizen</h2>
@@ -453,7 +550,9 @@ def render_html(project: QuestProject, include_js: bool = True) -> str:
 </body>
 </html>
 """
-    return html
+
+def render_html(project: QuestProject, include_js: bool = True) -> str:
+    return "".join(iter_html(project, include_js))
 
 
 # ----------------------------
@@ -472,6 +571,26 @@ class QuestEditorApp(tk.Tk):
         self.project.nodes.append(Node(node_id="start", title="Start: Ardea"))
 
         self.current_node_index: Optional[int] = None
+        # Index aller Knoten-IDs (mit Anzahl), wird bei jeder Änderung mitgepflegt;
+        # _dup_ids enthält die IDs, die mehr als einmal vorkommen
+        self._node_id_counts: Counter[str] = Counter()
+        self._dup_ids: Set[str] = set()
+        # Auswahlliste für Ziel-IDs im Options-Dialog (sortierte IDs + "top"/"end");
+        # None = ID-Menge hat sich geändert, beim nächsten Dialog neu aufbauen
+        self._target_choices: Optional[Tuple[str, ...]] = None
+        self._reset_node_ids()
+        # nächster Kandidat für "knoten-N"; wächst nur, damit _add_node nicht jedes Mal bei 1 anfängt
+        self._next_knoten_idx = 1
+        # zuletzt in die Listbox geschriebene Zeilen
+        self._last_labels: List[str] = []
+        # True, sobald im Editor am aktuellen Knoten bzw. an den Metadaten etwas geändert wurde
+        self._node_dirty = False
+        self._meta_dirty = False
+        # Zeilen, die zuletzt in tree_opts geladen wurden (None = Tree wurde seitdem bearbeitet)
+        self._opts_rows: Optional[List[Tuple[str, str]]] = None
+        # Options-Dialog wird beim ersten Öffnen gebaut und danach nur versteckt/gezeigt
+        self._opt_dlg: Optional[tk.Toplevel] = None
+        self._opt_dlg_iid: Optional[str] = None
 
         self._build_ui()
         self._load_meta_to_ui()
@@ -528,6 +647,13 @@ class QuestEditorApp(tk.Tk):
         self.txt_imp_flags = ScrolledText(meta_box, height=3, width=30, wrap="word")
         self.txt_imp_flags.grid(row=9, column=1, sticky="ew", pady=2)
 
+        self._meta_texts = (self.txt_short, self.txt_meta_short, self.txt_rewards, self.txt_imp_flags)
+        for w in self._meta_texts:
+            w.bind("<<Modified>>", self._on_meta_text_modified)
+        for var in (self.var_quest_name, self.var_region, self.var_quest_giver,
+                    self.var_prereq, self.var_type, self.var_version):
+            var.trace_add("write", self._mark_meta_dirty)
+
         # Nodes list
         nodes_box = ttk.Labelframe(left, text="Knoten", padding=10)
         nodes_box.grid(row=2, column=0, sticky="nsew")
@@ -557,7 +683,8 @@ class QuestEditorApp(tk.Tk):
 
         ttk.Button(proj_btns, text="💾 Projekt speichern (JSON)", command=self._save_project).grid(row=0, column=0, sticky="ew", padx=2)
         ttk.Button(proj_btns, text="📂 Projekt öffnen (JSON)", command=self._load_project).grid(row=0, column=1, sticky="ew", padx=2)
-        ttk.Button(proj_btns, text="🧾 HTML exportieren", command=self._export_html).grid(row=0, column=2, sticky="ew", padx=2)
+        self.btn_export = ttk.Button(proj_btns, text="🧾 HTML exportieren", command=self._export_html)
+        self.btn_export.grid(row=0, column=2, sticky="ew", padx=2)
 
         # Right panel: Node editor
         right = ttk.Frame(self, padding=10)
@@ -609,6 +736,24 @@ class QuestEditorApp(tk.Tk):
         self.txt_notes = ScrolledText(editor, height=4, wrap="word")
         self.txt_notes.grid(row=8, column=1, columnspan=2, sticky="nsew", pady=3)
 
+        # Änderungen am Knoten mitschreiben, damit ein Knotenwechsel ohne
+        # Änderung nicht alle Textfelder aus Tk zurücklesen muss
+        # (Widget, Node-Feld, Umwandlung) - beim Übernehmen werden nur Felder gelesen,
+        # deren Tk-Modified-Flag gesetzt ist
+        self._node_text_fields = (
+            (self.txt_scene, "scene", str.strip),
+            (self.txt_dialog, "dialog", str.rstrip),
+            (self.txt_content, "content", str.strip),
+            (self.txt_info, "info_items", lines_to_list),
+            (self.txt_tech, "tech_flags", lines_to_list),
+            (self.txt_outcomes, "outcomes", lines_to_list),
+            (self.txt_notes, "notes", str.strip),
+        )
+        for w, _attr, _conv in self._node_text_fields:
+            w.bind("<<Modified>>", self._on_node_text_modified)
+        self.var_node_id.trace_add("write", self._mark_node_dirty)
+        self.var_node_title.trace_add("write", self._mark_node_dirty)
+
         # Options editor (separate box)
         opt_box = ttk.Labelframe(right, text="Optionen dieses Knotens (Label → Ziel-ID)", padding=10)
         opt_box.grid(row=1, column=0, sticky="ew", pady=(10,0))
@@ -647,8 +792,13 @@ class QuestEditorApp(tk.Tk):
         self._set_text(self.txt_meta_short, m.meta_short)
         self._set_text(self.txt_rewards, m.rewards)
         self._set_text(self.txt_imp_flags, m.important_flags)
+        # ohne Stand zeigt die UI einen frischen Zeitstempel, der erst beim Übernehmen ins Modell geht
+        self._meta_dirty = not m.version_stamp
 
     def _apply_meta_from_ui(self):
+        # wie bei den Knoten: <<Modified>> kommt verzögert, das Tk-Flag nicht
+        if not (self._meta_dirty or any(w.edit_modified() for w in self._meta_texts)):
+            return
         m = self.project.meta
         m.quest_name = self.var_quest_name.get().strip()
         m.region = self.var_region.get().strip()
@@ -662,11 +812,76 @@ class QuestEditorApp(tk.Tk):
         m.rewards = self._get_text(self.txt_rewards).strip()
         m.important_flags = self._get_text(self.txt_imp_flags).strip()
 
+        for w in self._meta_texts:
+            w.edit_modified(False)
+        self._meta_dirty = False
+
+    def _mark_meta_dirty(self, *_args):
+        self._meta_dirty = True
+
+    def _on_meta_text_modified(self, evt):
+        if evt.widget.edit_modified():
+            self._meta_dirty = True
+
+    # ---------- Knoten-IDs ----------
+    def _reset_node_ids(self):
+        self._node_id_counts = Counter(n.node_id for n in self.project.nodes)
+        self._dup_ids = {k for k, v in self._node_id_counts.items() if v > 1}
+        self._target_choices = None
+
+    def _register_node_id(self, node_id: str):
+        self._node_id_counts[node_id] += 1
+        if self._node_id_counts[node_id] == 1:
+            self._target_choices = None
+        elif self._node_id_counts[node_id] == 2:
+            self._dup_ids.add(node_id)
+            self._sync_export_button()
+
+    def _unregister_node_id(self, node_id: str):
+        count = self._node_id_counts[node_id] - 1
+        if count > 0:
+            self._node_id_counts[node_id] = count
+        else:
+            del self._node_id_counts[node_id]
+            self._target_choices = None
+        if count == 1:
+            self._dup_ids.discard(node_id)
+            self._sync_export_button()
+
+    def _sync_export_button(self):
+        # solange IDs doppelt sind, ist Export gesperrt
+        self.btn_export.state(["disabled"] if self._dup_ids else ["!disabled"])
+
     # ---------- Nodes list ----------
+    @staticmethod
+    def _node_label(n: Node) -> str:
+        return f"{n.node_id}  —  {n.title}"
+
     def _refresh_node_list(self):
+        labels = [self._node_label(n) for n in self.project.nodes]
+        if labels == self._last_labels:
+            return
+        self._last_labels = labels
+        # ein delete + ein insert statt eines Tcl-Aufrufs pro Zeile
         self.lst_nodes.delete(0, tk.END)
-        for n in self.project.nodes:
-            self.lst_nodes.insert(tk.END, f"{n.node_id}  —  {n.title}")
+        self.lst_nodes.insert(tk.END, *labels)
+
+    def _update_node_row(self, idx: int):
+        # nur eine Zeile neu schreiben, Auswahl bleibt erhalten
+        label = self._node_label(self.project.nodes[idx])
+        if self._last_labels[idx] == label:
+            return
+        selected = self.lst_nodes.selection_includes(idx)
+        self.lst_nodes.delete(idx)
+        self.lst_nodes.insert(idx, label)
+        if selected:
+            self.lst_nodes.selection_set(idx)
+        self._last_labels[idx] = label
+
+    def _get_target_choices(self) -> Tuple[str, ...]:
+        if self._target_choices is None:
+            self._target_choices = tuple(sorted(self._node_id_counts)) + ("top", "end")
+        return self._target_choices
 
     def _on_node_select(self, _evt):
         if not self.lst_nodes.curselection():
@@ -693,6 +908,7 @@ class QuestEditorApp(tk.Tk):
         self._set_text(self.txt_notes, n.notes)
 
         self._reload_options_tree(n)
+        self._node_dirty = False
 
         self.lst_nodes.selection_clear(0, tk.END)
         self.lst_nodes.selection_set(idx)
@@ -704,20 +920,19 @@ class QuestEditorApp(tk.Tk):
         self._apply_current_node(silent=True)
 
         # neue ID generieren
-        base = "knoten"
-        i = 1
-        existing = {n.node_id for n in self.project.nodes}
-        new_id = f"{base}-{i}"
-        while new_id in existing:
-            i += 1
-            new_id = f"{base}-{i}"
+        while f"knoten-{self._next_knoten_idx}" in self._node_id_counts:
+            self._next_knoten_idx += 1
+        i = self._next_knoten_idx
+        new_id = f"knoten-{i}"
 
         new_node = Node(node_id=new_id, title=f"Knoten {i}", options=[Option(label="Weiter", target="end")])
         self.project.nodes.append(new_node)
+        self._register_node_id(new_id)
         self._refresh_node_list()
         self._select_node(len(self.project.nodes)-1)
 
     def _delete_node(self):
+        from tkinter import messagebox
         if self.current_node_index is None:
             return
         if len(self.project.nodes) <= 1:
@@ -730,6 +945,7 @@ class QuestEditorApp(tk.Tk):
             return
 
         del self.project.nodes[idx]
+        self._unregister_node_id(n.node_id)
         self.current_node_index = None
         self._refresh_node_list()
         self._select_node(max(0, idx-1))
@@ -752,6 +968,10 @@ class QuestEditorApp(tk.Tk):
     def _apply_current_node(self, silent: bool=False):
         if self.current_node_index is None:
             return
+        # automatische Sicherungen (Knotenwechsel, Speichern, Export) nur bei Änderungen;
+        # der Button "Änderungen übernehmen" übernimmt immer
+        if silent and not self._node_has_edits():
+            return
         n = self.project.nodes[self.current_node_index]
 
         node_id = sanitize_id(self.var_node_id.get())
@@ -759,31 +979,45 @@ class QuestEditorApp(tk.Tk):
 
         # ID-Kollision prüfen
         if node_id != n.node_id:
-            existing = {x.node_id for x in self.project.nodes}
-            if node_id in existing:
+            if node_id in self._node_id_counts:
                 if not silent:
+                    from tkinter import messagebox
                     messagebox.showerror("ID existiert", f"Die Knoten-ID '{node_id}' gibt es schon. Wähle eine andere.")
                 self.var_node_id.set(n.node_id)
                 return
+            self._unregister_node_id(n.node_id)
+            self._register_node_id(node_id)
 
         n.node_id = node_id
         n.title = title or n.node_id
-        n.scene = self._get_text(self.txt_scene).strip()
-        n.dialog = self._get_text(self.txt_dialog).rstrip()
-        n.content = self._get_text(self.txt_content).strip()
-        n.info_items = lines_to_list(self._get_text(self.txt_info))
-        n.tech_flags = lines_to_list(self._get_text(self.txt_tech))
-        n.outcomes = lines_to_list(self._get_text(self.txt_outcomes))
-        n.notes = self._get_text(self.txt_notes).strip()
+        for w, attr, conv in self._node_text_fields:
+            if w.edit_modified():
+                setattr(n, attr, conv(self._get_text(w)))
+                w.edit_modified(False)
 
         # Optionen aus Tree übernehmen
         n.options = []
         for iid in self.tree_opts.get_children():
-            label = self.tree_opts.set(iid, "label").strip()
-            target = sanitize_id(self.tree_opts.set(iid, "target").strip())
-            n.options.append(Option(label=label, target=target))
+            # eine Zeile = ein Tcl-Aufruf; str(), weil ttk Zahlen-Strings als int liefert
+            label, target = (str(v) for v in self.tree_opts.item(iid, "values"))
+            n.options.append(Option(label=label.strip(), target=sanitize_id(target.strip())))
 
-        self._refresh_node_list()
+        self._node_dirty = False
+
+        self._update_node_row(self.current_node_index)
+
+    def _node_has_edits(self) -> bool:
+        # <<Modified>> wird nur eingereiht und kann hinter einem schon wartenden Klick
+        # liegen -> das Tk-Flag der Textfelder selbst ist immer aktuell
+        return self._node_dirty or any(w.edit_modified() for w, _a, _c in self._node_text_fields)
+
+    def _mark_node_dirty(self, *_args):
+        self._node_dirty = True
+
+    def _on_node_text_modified(self, evt):
+        # <<Modified>> kommt auch beim Zurücksetzen des Flags -> nur echte Änderungen zählen
+        if evt.widget.edit_modified():
+            self._node_dirty = True
 
     def _id_from_title(self):
         t = self.var_node_title.get().strip()
@@ -793,12 +1027,19 @@ class QuestEditorApp(tk.Tk):
 
     # ---------- Optionen ----------
     def _reload_options_tree(self, node: Node):
+        rows = [(opt.label, opt.target) for opt in node.options]
+        if rows == self._opts_rows:
+            # Tree zeigt schon genau diese Zeilen (z. B. gleicher Knoten erneut gewählt)
+            return
+        self._opts_rows = rows
         self.tree_opts.delete(*self.tree_opts.get_children())
-        for opt in node.options:
-            self.tree_opts.insert("", tk.END, values=(opt.label, opt.target))
+        for row in rows:
+            self.tree_opts.insert("", tk.END, values=row)
 
     def _add_option(self):
         self.tree_opts.insert("", tk.END, values=("Neue Option", "top"))
+        self._opts_rows = None
+        self._node_dirty = True
 
     def _remove_option(self):
         sel = self.tree_opts.selection()
@@ -806,70 +1047,98 @@ class QuestEditorApp(tk.Tk):
             return
         for iid in sel:
             self.tree_opts.delete(iid)
+        self._opts_rows = None
+        self._node_dirty = True
 
     def _edit_option(self):
         sel = self.tree_opts.selection()
         if not sel:
             return
         iid = sel[0]
-        cur_label = self.tree_opts.set(iid, "label")
-        cur_target = self.tree_opts.set(iid, "target")
+        cur_label, cur_target = (str(v) for v in self.tree_opts.item(iid, "values"))
+
+        if self._opt_dlg is None:
+            self._build_option_dialog()
+        self._opt_dlg_iid = iid
+        self._opt_dlg_ent_l.delete(0, tk.END)
+        self._opt_dlg_ent_l.insert(0, cur_label)
+        self._opt_dlg_var_t.set(cur_target)
+        self._opt_dlg_cmb.configure(values=self._get_target_choices())
 
+        self._opt_dlg.deiconify()
+        self._opt_dlg.grab_set()
+        self._opt_dlg_ent_l.focus_set()
+
+    def _build_option_dialog(self):
         dlg = tk.Toplevel(self)
+        dlg.withdraw()
         dlg.title("Option bearbeiten")
         dlg.transient(self)
-        dlg.grab_set()
         dlg.geometry("520x200")
+        # Schließen versteckt nur, der Dialog wird wiederverwendet
+        dlg.protocol("WM_DELETE_WINDOW", self._close_option_dialog)
 
         dlg.columnconfigure(1, weight=1)
 
-        var_l = tk.StringVar(value=cur_label)
-        var_t = tk.StringVar(value=cur_target)
+        # var_t verbindet Entry und Combobox; das Label braucht keine Tcl-Variable
+        self._opt_dlg_var_t = tk.StringVar(dlg)
 
         ttk.Label(dlg, text="Label").grid(row=0, column=0, sticky="w", padx=10, pady=10)
-        ent_l = ttk.Entry(dlg, textvariable=var_l)
-        ent_l.grid(row=0, column=1, sticky="ew", padx=10, pady=10)
+        self._opt_dlg_ent_l = ttk.Entry(dlg)
+        self._opt_dlg_ent_l.grid(row=0, column=1, sticky="ew", padx=10, pady=10)
 
         ttk.Label(dlg, text="Ziel-ID").grid(row=1, column=0, sticky="w", padx=10, pady=10)
-        ent_t = ttk.Entry(dlg, textvariable=var_t)
-        ent_t.grid(row=1, column=1, sticky="ew", padx=10, pady=10)
+        ttk.Entry(dlg, textvariable=self._opt_dlg_var_t).grid(row=1, column=1, sticky="ew", padx=10, pady=10)
 
         # Quick dropdown mit existierenden IDs
-        ids = [n.node_id for n in self.project.nodes] + ["top", "end"]
-        cmb = ttk.Combobox(dlg, values=ids, textvariable=var_t, state="readonly")
-        cmb.grid(row=2, column=1, sticky="ew", padx=10, pady=(0,10))
+        self._opt_dlg_cmb = ttk.Combobox(dlg, textvariable=self._opt_dlg_var_t, state="readonly")
+        self._opt_dlg_cmb.grid(row=2, column=1, sticky="ew", padx=10, pady=(0,10))
         ttk.Label(dlg, text="(oder auswählen)").grid(row=2, column=0, sticky="w", padx=10, pady=(0,10))
 
-        def ok():
-            self.tree_opts.set(iid, "label", var_l.get().strip())
-            self.tree_opts.set(iid, "target", sanitize_id(var_t.get().strip()) or "top")
-            dlg.destroy()
+        ttk.Button(dlg, text="OK", command=self._ok_option_dialog).grid(row=3, column=1, sticky="e", padx=10, pady=10)
+        self._opt_dlg = dlg
+
+    def _ok_option_dialog(self):
+        iid = self._opt_dlg_iid
+        if iid is not None and self.tree_opts.exists(iid):
+            label = self._opt_dlg_ent_l.get().strip()
+            target = self._opt_dlg_var_t.get().strip()
+            self.tree_opts.item(iid, values=(label, sanitize_id(target) if target else "top"))
+            self._opts_rows = None
+            self._node_dirty = True
+        self._close_option_dialog()
 
-        ttk.Button(dlg, text="OK", command=ok).grid(row=3, column=1, sticky="e", padx=10, pady=10)
-        ent_l.focus_set()
+    def _close_option_dialog(self):
+        self._opt_dlg_iid = None
+        self._opt_dlg.grab_release()
+        self._opt_dlg.withdraw()
 
     # ---------- Projekt speichern/laden ----------
     def _save_project(self):
+        from tkinter import filedialog, messagebox
         self._apply_meta_from_ui()
         self._apply_current_node(silent=True)
 
-        path = filedialog.asksaveasfilename(
-            title="Projekt speichern",
-            defaultextension=".json",
-            filetypes=[("Quest Project (*.json)", "*.json")]
-        )
-        if not path:
-            return
-
-        data = project_to_jsonable(self.project)
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            messagebox.showinfo("Gespeichert", f"Projekt gespeichert:\n{path}")
+            # erst komplett kodieren, dann öffnet der Dialog die Datei: ein write(),
+            # und bei einem Fehler im Encoder bleibt die alte Datei unangetastet
+            payload = _dumps(project_to_jsonable(self.project))
+            f = filedialog.asksaveasfile(
+                mode="wb",
+                title="Projekt speichern",
+                defaultextension=".json",
+                filetypes=[("Quest Project (*.json)", "*.json")]
+            )
+            if f is None:
+                return
+            with f:
+                f.write(payload)
+            messagebox.showinfo("Gespeichert", f"Projekt gespeichert:\n{f.name}")
         except Exception as e:
             messagebox.showerror("Fehler", f"Konnte nicht speichern:\n{e}")
 
     def _load_project(self):
+        from tkinter import filedialog, messagebox
         path = filedialog.askopenfilename(
             title="Projekt öffnen",
             filetypes=[("Quest Project (*.json)", "*.json")]
@@ -877,26 +1146,36 @@ class QuestEditorApp(tk.Tk):
         if not path:
             return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            with open(path, "rb") as f:
+                data = _loads(f.read())
             self.project = project_from_jsonable(data)
             if not self.project.nodes:
                 self.project.nodes.append(Node(node_id="start", title="Start"))
+            self._reset_node_ids()
+            self._sync_export_button()
+            self._next_knoten_idx = 1
+            # alter Editor-Inhalt gehört nicht zum neuen Projekt
+            self.current_node_index = None
             self._load_meta_to_ui()
             self._refresh_node_list()
             self._select_node(0)
             messagebox.showinfo("Geladen", f"Projekt geladen:\n{path}")
+            if self._dup_ids:
+                messagebox.showwarning(
+                    "Doppelte IDs",
+                    "Diese Knoten-IDs gibt es mehrfach (Export ist gesperrt, bis sie eindeutig sind):\n"
+                    + ", ".join(sorted(self._dup_ids)))
         except Exception as e:
             messagebox.showerror("Fehler", f"Konnte nicht laden:\n{e}")
 
     # ---------- HTML Export ----------
     def _export_html(self):
+        from tkinter import filedialog, messagebox
         self._apply_meta_from_ui()
         self._apply_current_node(silent=True)
 
         # Minimal sanity: eindeutige IDs
-        ids = [n.node_id for n in self.project.nodes]
-        if len(ids) != len(set(ids)):
+        if self._dup_ids:
             messagebox.showerror("Fehler", "Es gibt doppelte Knoten-IDs. Bitte korrigieren.")
             return
 
@@ -907,22 +1186,45 @@ class QuestEditorApp(tk.Tk):
         )
         if not path:
             return
-
-        html = render_html(self.project, include_js=True)
         try:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(html)
+            # stückweise kodieren und schreiben - die ganze Seite liegt nie am Stück im Speicher.
+            # Erst in eine Temp-Datei daneben, dann ersetzen: ein Fehler beim Rendern
+            # hinterlässt kein halbes HTML über dem alten Export.
+            tmp_path = path + ".tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    for chunk in iter_html(self.project, include_js=True):
+                        f.write(chunk.encode("utf-8"))
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
             messagebox.showinfo("Export fertig", f"HTML exportiert:\n{path}")
         except Exception as e:
             messagebox.showerror("Fehler", f"Konnte HTML nicht schreiben:\n{e}")
 
     # ---------- Text helpers ----------
+    # widget._last_text = zuletzt gesetzter/gelesener Inhalt; gilt nur, solange
+    # edit_modified() False ist (jede Eingabe setzt das Flag)
     def _get_text(self, widget: ScrolledText) -> str:
-        return widget.get("1.0", "end-1c")
+        if not widget.edit_modified():
+            cached = getattr(widget, "_last_text", None)
+            if cached is not None:
+                return cached
+        text = widget.get("1.0", "end-1c")
+        widget._last_text = text
+        return text
 
     def _set_text(self, widget: ScrolledText, text: str):
-        widget.delete("1.0", tk.END)
-        widget.insert("1.0", text or "")
+        text = text or ""
+        # gleicher Inhalt und unverändert: kein Neuschreiben, Cursor/Scroll bleiben
+        if not widget.edit_modified() and getattr(widget, "_last_text", None) == text:
+            return
+        # ein replace statt delete + insert: ein Tcl-Aufruf, ein Redraw
+        widget.replace("1.0", "end-1c", text)
+        widget._last_text = text
+        widget.edit_modified(False)
 
 
 if __name__ == "__main__":